@@ -1,8 +1,57 @@
 # app.py
 
-import random
+import numpy as np
+import pandas as pd
 import streamlit as st
-import matplotlib.pyplot as plt
+
+# Price/inventory/PnL trajectories over a flat sequence of orders, in closed
+# form: each order moves the price by k * order + risk * (inventory before it)
+def _run(orders, price0, inv0, pnl0, k, risk):
+    n = orders.size
+    # Inventory is integer-valued; float32 is plenty for prices and PnL
+    inv = np.empty(n + 1, dtype=np.int32)
+    price = np.empty(n + 1, dtype=np.float32)
+    pnl = np.empty(n + 1, dtype=np.float32)
+    inv[0], price[0], pnl[0] = inv0, price0, pnl0
+    inv[1:] = inv0 - np.cumsum(orders, dtype=np.int32)
+    # Accumulate in float64 and round only when storing, so error doesn't build up
+    trade_delta = k * orders + risk * inv[:-1]
+    price[1:] = price0 + np.cumsum(trade_delta, dtype=np.float64)
+    pnl[1:] = pnl0 + np.cumsum(-orders * trade_delta, dtype=np.float64)
+    return price, inv, pnl
+
+# Largest-Triangle-Three-Buckets downsampling: returns the indices of the
+# points that best preserve the visual shape of the series
+def lttb_downsample(y, threshold):
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.arange(n)
+    # Bucket boundaries for the points between the first and the last
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    indices = np.empty(threshold, dtype=int)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        # Keep the point forming the largest triangle with the previous pick and the next bucket's average
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        indices[i + 1] = a
+    return indices
+
+MAX_PLOT_POINTS = 1000
+
+# (x, y) for plotting, downsampled when the series is long
+def plot_series(arr):
+    arr = np.asarray(arr)
+    if len(arr) <= MAX_PLOT_POINTS:
+        return np.arange(len(arr)), arr
+    indices = lttb_downsample(arr, MAX_PLOT_POINTS)
+    return indices, arr[indices]
 
 # Define the Market Maker class
 class MarketMaker:
@@ -11,10 +60,34 @@ class MarketMaker:
         self.inventory = inventory
         self.k = k  # Price impact factor
         self.inventory_risk = inventory_risk  # Inventory risk factor
-        self.price_history = [initial_price]
-        self.inventory_history = [inventory]
         self.profit_loss = 0
-        self.pnl_history = [0]
+        # History buffers, preallocated by reserve() and filled up to _idx
+        self._price_arr = np.array([initial_price], dtype=np.float32)
+        self._inventory_arr = np.array([inventory], dtype=np.int32)
+        self._pnl_arr = np.zeros(1, dtype=np.float32)
+        self._idx = 1
+
+    @property
+    def price_history(self):
+        return self._price_arr[:self._idx]
+
+    @property
+    def inventory_history(self):
+        return self._inventory_arr[:self._idx]
+
+    @property
+    def pnl_history(self):
+        return self._pnl_arr[:self._idx]
+
+    def reserve(self, n):
+        # Make room for n more trades so execute_order writes by index;
+        # capacity at least doubles so unreserved appends stay amortized O(1)
+        if self._idx + n <= self._price_arr.size:
+            return
+        extra = max(self._idx + n, 2 * self._price_arr.size) - self._idx
+        self._price_arr = np.concatenate([self.price_history, np.empty(extra, dtype=np.float32)])
+        self._inventory_arr = np.concatenate([self.inventory_history, np.empty(extra, dtype=np.int32)])
+        self._pnl_arr = np.concatenate([self.pnl_history, np.empty(extra, dtype=np.float32)])
         
     def adjust_price(self, order_size):
         # Price adjustment due to order size
@@ -34,29 +107,69 @@ class MarketMaker:
         # Update profit/loss
         self.profit_loss += -order_size * (transaction_price - prev_price)
         # Record history
-        self.price_history.append(self.price)
-        self.inventory_history.append(self.inventory)
-        self.pnl_history.append(self.profit_loss)
+        self.reserve(1)
+        self._price_arr[self._idx] = self.price
+        self._inventory_arr[self._idx] = self.inventory
+        self._pnl_arr[self._idx] = self.profit_loss
+        self._idx += 1
+
+    def execute_orders(self, order_sizes):
+        # Vectorized equivalent of calling execute_order for each order in turn
+        order_sizes = np.ascontiguousarray(order_sizes, dtype=np.int32)
+        if order_sizes.size == 0:
+            return
+        price, inventory, pnl = _run(order_sizes, self.price, self.inventory, self.profit_loss, self.k, self.inventory_risk)
+        # Update state and record history (index 0 is the current state)
+        self.price = float(price[-1])
+        self.inventory = int(inventory[-1])
+        self.profit_loss = float(pnl[-1])
+        n = order_sizes.size
+        self.reserve(n)
+        self._price_arr[self._idx:self._idx + n] = price[1:]
+        self._inventory_arr[self._idx:self._idx + n] = inventory[1:]
+        self._pnl_arr[self._idx:self._idx + n] = pnl[1:]
+        self._idx += n
 
 # Define the Trader class
 class Trader:
-    def __init__(self, trader_id, strategy='random'):
+    def __init__(self, trader_id, strategy='random', steps=0):
         self.trader_id = trader_id
         self.strategy = strategy
-        self.order_history = []
+        # Inclusive order size bounds for the strategy, resolved once
+        self.low, self.high = {'buy': (1, 10), 'sell': (-10, -1), 'random': (-10, 10)}.get(strategy, (0, 0))
+        # Order buffer preallocated for the number of steps, filled up to num_orders
+        self._order_arr = np.empty(steps, dtype=np.int8)
+        self.num_orders = 0
+        # Orders drawn up front by the Market, one per step
+        self.pending_orders = None
         self.trade_price_history = []
         self.inventory = 0
         
-    def decide_order(self):
-        if self.strategy == 'buy':
-            order_size = random.randint(1, 10)
-        elif self.strategy == 'sell':
-            order_size = -random.randint(1, 10)
-        elif self.strategy == 'random':
-            order_size = random.randint(-10, 10)
-        else:
-            order_size = 0
-        self.order_history.append(order_size)
+    @property
+    def order_history(self):
+        return self._order_arr[:self.num_orders]
+
+    def reserve(self, n):
+        # Make room for n more orders, at least doubling the capacity
+        if self.num_orders + n <= self._order_arr.size:
+            return
+        extra = max(self.num_orders + n, 2 * self._order_arr.size) - self.num_orders
+        self._order_arr = np.concatenate([self.order_history, np.empty(extra, dtype=np.int8)])
+
+    def record_orders(self, order_sizes):
+        # Append a batch of orders to the order history
+        n = len(order_sizes)
+        self.reserve(n)
+        self._order_arr[self.num_orders:self.num_orders + n] = order_sizes
+        self.num_orders += n
+
+    def decide_order(self, step):
+        if self.pending_orders is None:
+            raise ValueError(f"Trader {self.trader_id} has no pending orders; run it through a Market")
+        order_size = int(self.pending_orders[step])
+        self.reserve(1)
+        self._order_arr[self.num_orders] = order_size
+        self.num_orders += 1
         return order_size
         
     def record_trade(self, order_size, price):
@@ -65,18 +178,114 @@ class Trader:
 
 # Define the Market class
 class Market:
-    def __init__(self, market_maker, traders):
+    def __init__(self, market_maker, traders, rng=None):
         self.market_maker = market_maker
         self.traders = traders
         self.time_steps = 0
+        # Source of randomness for orders not given an explicit generator
+        self.rng = rng if rng is not None else np.random.default_rng()
         
-    def simulate_step(self):
+    def simulate_step(self, step=None):
         self.time_steps += 1
+        if step is None:
+            # No orders drawn up front: draw this step's orders in one call
+            orders = self.sample_orders(1)
+            for i, trader in enumerate(self.traders):
+                trader.pending_orders = orders[:, i]
+            step = 0
         for trader in self.traders:
-            order_size = trader.decide_order()
+            order_size = trader.decide_order(step)
             self.market_maker.execute_order(order_size)
             trader.record_trade(order_size, self.market_maker.price)
 
+    def sample_orders(self, steps, rng=None):
+        # Draw every order in one call: one row per time step, one column per trader
+        if rng is None:
+            rng = self.rng
+        # Per-trader order size bounds, broadcast across time steps
+        low = np.array([trader.low for trader in self.traders])
+        high = np.array([trader.high for trader in self.traders])
+        return rng.integers(low, high + 1, size=(steps, len(self.traders)))
+
+    def simulate(self, steps, rng=None):
+        # Step-by-step simulation with the orders and history buffers allocated once
+        orders = self.sample_orders(steps, rng)
+        for i, trader in enumerate(self.traders):
+            trader.pending_orders = orders[:, i]
+        self.market_maker.reserve(steps * len(self.traders))
+        for trader in self.traders:
+            trader.reserve(steps)
+        for step in range(steps):
+            self.simulate_step(step)
+        return orders
+
+    def simulate_batch(self, steps, rng=None, record_history=True):
+        # Run all steps at once; returns the (steps, num_traders) array of orders
+        orders = self.sample_orders(steps, rng)
+        self.time_steps += steps
+        if orders.size == 0:
+            return orders
+        # Orders reach the market maker step by step, trader by trader
+        start = len(self.market_maker.price_history)
+        self.market_maker.execute_orders(orders.reshape(-1))
+        for i, trader in enumerate(self.traders):
+            trader.inventory += int(orders[:, i].sum())
+        # Per-trader order and trade price histories, skipped when only the
+        # market maker's histories are needed
+        if record_history:
+            prices = np.asarray(self.market_maker.price_history[start:]).reshape(orders.shape)
+            for i, trader in enumerate(self.traders):
+                trader.record_orders(orders[:, i])
+                trader.trade_price_history.extend(prices[:, i].tolist())
+        return orders
+
+# Cached simulation run, keyed on every parameter (including the seed)
+@st.cache_data(max_entries=32)
+def run_simulation(steps, num_traders, initial_price, k, inventory_risk, strategies, seed):
+    market_maker = MarketMaker(initial_price=initial_price, k=k, inventory_risk=inventory_risk)
+    traders = [Trader(trader_id=i+1, strategy=strategies[i]) for i in range(num_traders)]
+    market = Market(market_maker, traders, rng=np.random.default_rng(seed))
+    orders = market.simulate_batch(steps, record_history=False)
+    return {
+        'price': market_maker.price_history,
+        'inventory': market_maker.inventory_history,
+        'pnl': market_maker.pnl_history,
+        'trader_orders': orders,
+    }
+
+# Simulation result plots
+def _results_panel(results):
+    # Plotting the results
+    st.subheader("Simulation Results")
+
+    # Price History Plot
+    st.markdown("### Market Price Over Time")
+    x, price = plot_series(results['price'])
+    st.line_chart({'Time Steps': x, 'Price': price}, x='Time Steps', y='Price')
+
+    # Inventory and Profit/Loss Plots
+    st.markdown("### Market Maker's Inventory and Profit/Loss Over Time")
+    col1, col2 = st.columns(2)
+
+    # Inventory Plot
+    col1.markdown("**Market Maker Inventory Level Over Time**")
+    x, inventory = plot_series(results['inventory'])
+    col1.line_chart({'Time Steps': x, 'Inventory Level': inventory}, x='Time Steps', y='Inventory Level', color='#ffa500', y_label='Inventory Level (Number of Shares)')
+
+    # Profit/Loss Plot
+    col2.markdown("**Market Maker Cumulative Profit/Loss Over Time**")
+    x, pnl = plot_series(results['pnl'])
+    col2.line_chart({'Time Steps': x, 'Cumulative Profit/Loss': pnl}, x='Time Steps', y='Cumulative Profit/Loss', color='#008000', y_label='Profit/Loss (Currency Units)')
+
+# Traders' inventory plot; a fragment so toggling it reruns only this block
+@st.fragment
+def _trader_panel(orders, strategies):
+    show_trader_info = st.checkbox("Show Traders' Inventory Over Time")
+    if show_trader_info:
+        st.markdown("### Traders' Inventory Levels Over Time")
+        trader_inventories = pd.DataFrame(orders.cumsum(axis=0), columns=[f'Trader {i+1} ({strategy})' for i, strategy in enumerate(strategies)])
+        st.line_chart(trader_inventories, x_label='Time Steps', y_label='Inventory Level (Number of Shares)')
+
 # Streamlit app code
 def main():
     st.title("Interactive Market Maker Simulator")
@@ -96,6 +305,7 @@ def main():
     initial_price = st.sidebar.number_input("Initial Market Price", min_value=1.0, max_value=1000.0, value=100.0)
     k = st.sidebar.slider("Price Impact Factor (k)", min_value=0.0, max_value=1.0, value=0.1, help="Controls how much the price adjusts based on order size.")
     inventory_risk = st.sidebar.slider("Inventory Risk Factor", min_value=0.0, max_value=0.5, value=0.05, help="Controls how much the price adjusts based on the market maker's inventory.")
+    seed = st.sidebar.number_input("Random Seed", min_value=0, max_value=2**32 - 1, value=0, help="Runs with the same parameters and seed produce the same results.")
 
     st.sidebar.header("Trader Strategies")
     trader_strategies = []
@@ -103,57 +313,19 @@ def main():
         strategy = st.sidebar.selectbox(f"Trader {i+1} Strategy", ('buy', 'sell', 'random'), index=2, key=f'strategy_{i}')
         trader_strategies.append(strategy)
 
-    # Initialize market maker and traders
-    market_maker = MarketMaker(initial_price=initial_price, k=k, inventory_risk=inventory_risk)
-    traders = [Trader(trader_id=i+1, strategy=trader_strategies[i]) for i in range(num_traders)]
-    market = Market(market_maker, traders)
-
+    # Remember the parameters of the last run so later reruns (e.g. toggling
+    # the traders' inventory checkbox) keep showing its results
     if st.button("Run Simulation"):
-        for _ in range(simulation_steps):
-            market.simulate_step()
-        # Plotting the results
-        st.subheader("Simulation Results")
-
-        # Price History Plot
-        st.markdown("### Market Price Over Time")
-        st.line_chart(market_maker.price_history)
-
-        # Inventory and Profit/Loss Plots
-        st.markdown("### Market Maker's Inventory and Profit/Loss Over Time")
-        fig, axs = plt.subplots(1, 2, figsize=(14, 5))
-
-        # Inventory Plot
-        axs[0].plot(market_maker.inventory_history, label='Inventory Level', color='orange')
-        axs[0].set_title('Market Maker Inventory Level Over Time')
-        axs[0].set_xlabel('Time Steps')
-        axs[0].set_ylabel('Inventory Level (Number of Shares)')
-        axs[0].legend()
-        axs[0].grid(True)
-
-        # Profit/Loss Plot
-        axs[1].plot(market_maker.pnl_history, label='Cumulative Profit/Loss', color='green')
-        axs[1].set_title('Market Maker Cumulative Profit/Loss Over Time')
-        axs[1].set_xlabel('Time Steps')
-        axs[1].set_ylabel('Profit/Loss (Currency Units)')
-        axs[1].legend()
-        axs[1].grid(True)
-
-        st.pyplot(fig)
+        st.session_state['simulation_params'] = (simulation_steps, num_traders, initial_price, k, inventory_risk, tuple(trader_strategies), seed)
+
+    if 'simulation_params' in st.session_state:
+        params = st.session_state['simulation_params']
+        strategies = params[5]
+        results = run_simulation(*params)
+        _results_panel(results)
 
         # Optionally, display trader inventories
-        show_trader_info = st.checkbox("Show Traders' Inventory Over Time")
-        if show_trader_info:
-            st.markdown("### Traders' Inventory Levels Over Time")
-            fig_traders, ax_traders = plt.subplots(figsize=(10, 6))
-            for trader in traders:
-                trader_inventory = [sum(trader.order_history[:i+1]) for i in range(len(trader.order_history))]
-                ax_traders.plot(trader_inventory, label=f'Trader {trader.trader_id} ({trader.strategy})')
-            ax_traders.set_title("Traders' Inventory Levels Over Time")
-            ax_traders.set_xlabel('Time Steps')
-            ax_traders.set_ylabel('Inventory Level (Number of Shares)')
-            ax_traders.legend()
-            ax_traders.grid(True)
-            st.pyplot(fig_traders)
+        _trader_panel(results['trader_orders'], strategies)
 
         # Add explanations for the results
         st.markdown("""
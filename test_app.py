@@ -0,0 +1,70 @@
+import numpy as np
+
+from app import Market, MarketMaker, Trader, lttb_downsample, plot_series
+
+
+def make_market(strategies, rng=None):
+    market_maker = MarketMaker(initial_price=100.0, k=0.1, inventory_risk=0.05)
+    traders = [Trader(trader_id=i+1, strategy=strategy) for i, strategy in enumerate(strategies)]
+    return Market(market_maker, traders, rng=rng)
+
+
+def test_batch_matches_step_by_step():
+    strategies = ['buy', 'sell', 'random', 'random']
+    batch = make_market(strategies)
+    stepped = make_market(strategies)
+    batch_orders = batch.simulate_batch(200, rng=np.random.default_rng(42))
+    stepped_orders = stepped.simulate(200, rng=np.random.default_rng(42))
+
+    np.testing.assert_array_equal(batch_orders, stepped_orders)
+    np.testing.assert_array_equal(batch.market_maker.inventory_history, stepped.market_maker.inventory_history)
+    np.testing.assert_allclose(batch.market_maker.price_history, stepped.market_maker.price_history, rtol=1e-6, atol=1e-6)
+    np.testing.assert_allclose(batch.market_maker.pnl_history, stepped.market_maker.pnl_history, rtol=1e-6, atol=1e-6)
+    for batch_trader, stepped_trader in zip(batch.traders, stepped.traders):
+        np.testing.assert_array_equal(batch_trader.order_history, stepped_trader.order_history)
+        np.testing.assert_allclose(batch_trader.trade_price_history, stepped_trader.trade_price_history, rtol=1e-6, atol=1e-6)
+        assert batch_trader.inventory == stepped_trader.inventory
+
+
+def test_simulate_step_uses_seeded_market_rng():
+    histories = []
+    for _ in range(2):
+        market = make_market(['buy', 'sell'], rng=np.random.default_rng(7))
+        for _ in range(10):
+            market.simulate_step()
+        assert (market.traders[0].order_history > 0).all()
+        assert (market.traders[1].order_history < 0).all()
+        histories.append(market.market_maker.price_history)
+    np.testing.assert_array_equal(*histories)
+
+
+def test_batch_with_no_steps_or_traders():
+    market = make_market(['buy'])
+    assert market.simulate_batch(0).shape == (0, 1)
+    assert len(market.market_maker.price_history) == 1
+    assert make_market([]).simulate_batch(3).shape == (3, 0)
+
+
+def test_repeated_runs_extend_history():
+    market = make_market(['buy', 'sell'])
+    market.simulate_batch(3)
+    for _ in range(3):
+        market.simulate_step()
+    market.simulate_batch(3)
+    assert len(market.market_maker.price_history) == 1 + 9 * 2
+    for trader in market.traders:
+        assert len(trader.order_history) == 9
+        assert trader.inventory == sum(trader.order_history)
+
+
+def test_lttb_downsample():
+    y = np.random.default_rng(0).normal(size=5000).cumsum()
+    indices = lttb_downsample(y, 100)
+    assert len(indices) == 100
+    assert indices[0] == 0 and indices[-1] == len(y) - 1
+    assert (np.diff(indices) > 0).all()
+    # Short series are returned unchanged
+    np.testing.assert_array_equal(lttb_downsample(y[:100], 100), np.arange(100))
+    x, short = plot_series(y[:50])
+    np.testing.assert_array_equal(x, np.arange(50))
+    np.testing.assert_array_equal(short, y[:50])